@@ -4,8 +4,15 @@ import os
 import re
 import subprocess
 import sys
-import tempfile
-from collections import defaultdict, deque
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+# "CR ID: xxx"（值也可能在下一行）
+_CR_ID_RE = re.compile(r"CR ID:\s*(\S.*)?")
+# "[Google Security Patch][CVE-XXXX]Something"
+_GSP_RE = re.compile(r"\[Google Security Patch\]\s*\[[^\]]+\](.*)")
 
 # ------------------------------------------------------------
 # 1. 解析 patch_list.txt
@@ -26,124 +33,103 @@ def parse_patch_list(path):
     if not os.path.exists(path):
         raise FileNotFoundError(f"patch_list.txt not found at {path}")
 
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        content = f.read()
-
-    # 以 "Patch Type:" 切每筆
-    raw_entries = content.split("Patch Type:")
-    entries = []
-    for raw in raw_entries:
-        if raw.strip():
-            # 把前面的 "Patch Type:" 加回去，方便解析
-            if not raw.lstrip().startswith(":"):
-                raw = "Patch Type:" + raw
-            entries.append(raw)
-
     results = []
-    for entry in entries:
-        lines = entry.splitlines()
-        if not lines:
-            continue
 
-        cr_id = None
-        patch_type = ""
-        severity = ""
-        desc_first = "No Description"
-        desc_full_lines = []
-        files = []
+    def flush(entry):
+        if not entry["cr_id"]:
+            return
+        # CR ID 與檔案路徑之後會大量當 dict key / set 元素使用，
+        # intern 後重複的字串共用同一個物件，比對也更快
+        results.append({
+            "cr_id": sys.intern(entry["cr_id"]),
+            "patch_type": entry["patch_type"],
+            "severity": entry["severity"],
+            "description_first": entry["desc_first"] or "No Description",
+            "description_full": "\n".join(entry["desc_lines"]).strip(),
+            "files": entry["files"],
+        })
+
+    def new_entry():
+        return {
+            "cr_id": None,
+            "patch_type": "",
+            "severity": "",
+            "desc_first": None,
+            "desc_lines": [],
+            "files": [],
+        }
+
+    # 逐行讀，一次只保留目前這一筆的狀態：
+    #   pending: 欄位標頭之後還在等值的欄位（patch_type / cr_id / severity）
+    #   section: 目前在 Description 或 Associated Files 區塊內
+    current = new_entry()
+    pending = None
+    section = None
 
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            s = line.strip()
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for raw in f:
+            s = raw.strip()
 
-            # Patch Type:
+            # 每筆以 "Patch Type:" 開頭
             if s.startswith("Patch Type"):
                 # 格式通常:
                 # Patch Type:
                 #   Customer Request
-                j = i + 1
-                val = ""
-                while j < len(lines) and not lines[j].strip():
-                    j += 1
-                if j < len(lines):
-                    val = lines[j].strip()
-                patch_type = val
-                i += 1
+                flush(current)
+                current = new_entry()
+                pending = "patch_type"
+                section = None
                 continue
 
-            # CR ID:
-            if s.startswith("CR ID"):
-                # 支援 "CR ID: xxx" 與下一行才是值兩種
-                m = re.match(r"CR ID:\s*(\S.*)?", s)
-                if m and m.group(1):
-                    cr_id = m.group(1).strip()
+            # Description 區塊一路收到 Associated Files 為止
+            if section == "description":
+                if s.startswith("Associated Files"):
+                    section = "files"
                 else:
-                    j = i + 1
-                    while j < len(lines) and not lines[j].strip():
-                        j += 1
-                    if j < len(lines):
-                        cr_id = lines[j].strip()
-                i += 1
+                    current["desc_lines"].append(raw.rstrip())
+                    # 順便記下第一個非空行，不用之後再掃一次
+                    if s and current["desc_first"] is None:
+                        current["desc_first"] = s
                 continue
 
-            # Severity:
-            if s.startswith("Severity"):
-                j = i + 1
-                val = ""
-                # 有可能下一行就是空白代表沒填
-                while j < len(lines) and not lines[j].strip():
-                    # 這邊保留第一個空白當「空 severity」
-                    # 所以直接 break 就好
-                    break
-                if j < len(lines) and lines[j].strip():
-                    val = lines[j].strip()
-                severity = val
-                i += 1
+            # Associated Files 後面全部視為檔案路徑（非空行）
+            if section == "files":
+                if s:
+                    current["files"].append(sys.intern(s))
                 continue
 
-            # Description 區塊
-            if s.startswith("Description"):
-                j = i + 1
-                desc_lines = []
-                while j < len(lines):
-                    next_line = lines[j]
-                    if next_line.strip().startswith("Associated Files"):
-                        break
-                    desc_lines.append(next_line.rstrip("\n"))
-                    j += 1
-                desc_full_lines = [l.rstrip() for l in desc_lines]
-                for l in desc_lines:
-                    if l.strip():
-                        desc_first = l.strip()
-                        break
-                i = j
-                continue
+            # 上一個欄位的值：取標頭後第一個非空行
+            # （值那一行本身仍照一般規則判斷，和原本的行為一致）
+            if pending == "severity":
+                # 有可能下一行就是空白代表沒填
+                current["severity"] = s
+                pending = None
+            elif pending and s:
+                current[pending] = s
+                pending = None
 
-            # Associated Files 後面全部視為檔案路徑（非空行）
-            if s.startswith("Associated Files"):
-                j = i + 1
-                while j < len(lines):
-                    l = lines[j].strip()
-                    if l:
-                        files.append(l)
-                    j += 1
-                break
-
-            i += 1
-
-        if not cr_id:
-            continue
+            if not s.startswith(("CR ID", "Severity", "Description", "Associated Files")):
+                continue
 
-        result = {
-            "cr_id": cr_id,
-            "patch_type": patch_type,
-            "severity": severity,
-            "description_first": desc_first,
-            "description_full": "\n".join(desc_full_lines).strip(),
-            "files": files,
-        }
-        results.append(result)
+            # CR ID:
+            if s.startswith("CR ID"):
+                # 支援 "CR ID: xxx" 與下一行才是值兩種
+                m = _CR_ID_RE.match(s)
+                if m and m.group(1):
+                    current["cr_id"] = m.group(1).strip()
+                else:
+                    pending = "cr_id"
+            elif s.startswith("Severity"):
+                current["severity"] = ""
+                pending = "severity"
+            elif s.startswith("Description"):
+                current["desc_lines"] = []
+                current["desc_first"] = None
+                section = "description"
+            else:
+                section = "files"
+
+    flush(current)
 
     return results
 
@@ -152,59 +138,83 @@ def parse_patch_list(path):
 # 2. 檔案 -> git project (往上找 .git)
 # ------------------------------------------------------------
 
-def find_git_project_for_file(root_dir, file_rel_path, cache):
+def _find_project_upward(start_dir, root_dir_abs, cache):
     """
-    給一個相對於 root_dir 的檔案路徑（例如 vendor/...），
-    一路往上找 .git，找到的那一層當作 project root。
+    從 start_dir 一路往上找 project root。
 
-    回傳：
-      - project 路徑（相對於 root_dir，例如 "frameworks/base"）
-      - 找不到就回傳 None
+    回傳 (project_root_abs, project_rel) 或 None，
+    並把沿路經過的 dir 都回填到 cache（包含找不到的 None），
+    之後同一棵子樹底下的檔案只要查一次 dict 就好。
     """
-    root_dir_abs = os.path.abspath(root_dir)
-    abs_path = os.path.abspath(os.path.join(root_dir_abs, file_rel_path))
-
-    # 不在 root 底下就忽略
-    if not abs_path.startswith(root_dir_abs):
-        print(f"[WARN] File '{file_rel_path}' is not under root '{root_dir_abs}', skip.")
-        return None
-
-    # 從檔案所在的 dir 開始往上找
-    cur = os.path.dirname(abs_path)
+    cur = start_dir
+    chain = []
 
     while True:
         if cur in cache:
-            proj_root = cache[cur]
+            project = cache[cur]
             break
 
-        git_marker = os.path.join(cur, ".git")
-        if os.path.exists(git_marker):
-            cache[cur] = cur
-            proj_root = cur
+        chain.append(cur)
+
+        # 用 lexists（lstat）即可，.git 可能是檔案或 symlink，不需要跟隨
+        if os.path.lexists(os.path.join(cur, ".git")):
+            project_rel = os.path.relpath(cur, root_dir_abs)
+            # root 本身是 git repo 的情況：relpath 會是 "."
+            if project_rel == ".":
+                project_rel = ""  # 用空字串代表根 repo
+            project = (cur, sys.intern(project_rel))
             break
 
         # 到 root 了還沒找到 .git，視為沒有 project
-        if os.path.abspath(cur) == root_dir_abs:
-            cache[cur] = None
-            proj_root = None
+        if cur == root_dir_abs:
+            project = None
             break
 
         parent = os.path.dirname(cur)
         if parent == cur:
-            cache[cur] = None
-            proj_root = None
+            project = None
             break
 
         cur = parent
 
-    if proj_root is None:
+    for d in chain:
+        cache[d] = project
+    return project
+
+
+def find_git_project_for_file(root_dir, file_rel_path, cache):
+    """
+    給一個相對於 root_dir 的檔案路徑（例如 vendor/...），
+    一路往上找 .git，找到的那一層當作 project root。
+
+    回傳：
+      - (project 路徑, 檔案絕對路徑, 檔案相對於 project 的路徑)
+        例如 ("frameworks/base", "/.../frameworks/base/core/Foo.java", "core/Foo.java")
+      - 找不到就回傳 None
+    """
+    root_dir_abs = os.path.abspath(root_dir)
+    abs_path = os.path.abspath(os.path.join(root_dir_abs, file_rel_path))
+
+    # 不在 root 底下就忽略
+    if not abs_path.startswith(root_dir_abs):
+        print(f"[WARN] File '{file_rel_path}' is not under root '{root_dir_abs}', skip.")
         return None
 
-    project_rel = os.path.relpath(proj_root, root_dir_abs)
-    # root 本身是 git repo 的情況：relpath 會是 "."
-    if project_rel == ".":
-        project_rel = ""  # 用空字串代表根 repo
-    return project_rel
+    # 同一個 dir 底下的檔案（patch_list 裡最常見）解析過一次後，
+    # 之後都只是一次 dict 查詢，不進入往上找的迴圈
+    cur = os.path.dirname(abs_path)
+    if cur in cache:
+        project = cache[cur]
+    else:
+        project = _find_project_upward(cur, root_dir_abs, cache)
+
+    if project is None:
+        return None
+
+    proj_root, project_rel = project
+    # abs_path 已正規化且在 proj_root 底下，直接切字串即可，不用 relpath
+    rel_to_repo = abs_path[len(proj_root):].lstrip(os.sep)
+    return project_rel, abs_path, rel_to_repo
 
 
 def build_project_groups(parsed, root_dir):
@@ -213,13 +223,22 @@ def build_project_groups(parsed, root_dir):
     root_dir: 專案根目錄（~/g700）
 
     回傳：
-    - project_map: { project_path: { cr_id: set(files_in_this_project) } }
+    - project_map: { project_path: { cr_id: [(file, abs_path, rel_to_repo), ...] } }
         project_path 例如 "frameworks/base" 或 "" (root repo)
+        file 是 patch_list 裡的原始路徑，路徑換算只在這裡做一次；
+        每個 list 已去重並依 file 排序
     - cr_info: { cr_id: {... 各種欄位 ...} }
     """
-    project_map = defaultdict(lambda: defaultdict(set))
+    project_map = defaultdict(lambda: defaultdict(list))
     cr_info = {}
-    git_cache = {}  # dir_abs -> project_root_abs 或 None
+    git_cache = {}  # dir_abs -> (project_root_abs, project_rel) 或 None
+
+    # 同一個檔案常出現在多個 CR，先對去重後的檔案各解析一次
+    file_proj = {}
+    for item in parsed:
+        for f in item["files"]:
+            if f not in file_proj:
+                file_proj[f] = find_git_project_for_file(root_dir, f, git_cache)
 
     for item in parsed:
         cr_id = item["cr_id"]
@@ -231,19 +250,35 @@ def build_project_groups(parsed, root_dir):
 
         # 記錄 CR 的描述與欄位
         if cr_id not in cr_info:
+            # commit body 用的 Description（每行縮排兩格），
+            # 同一個 CR 可能出現在多個 commit，先算好一次
+            if desc_full:
+                desc_indented = "\n".join("  " + l.lstrip() for l in desc_full.splitlines())
+            elif desc_first:
+                desc_indented = f"  {desc_first}"
+            else:
+                desc_indented = "  (no description)"
+
             cr_info[cr_id] = {
                 "patch_type": patch_type,
                 "severity": severity,
                 "description_first": desc_first,
                 "description_full": desc_full,
+                "description_indented": desc_indented,
             }
 
         for f in files:
-            proj = find_git_project_for_file(root_dir, f, git_cache)
-            if proj is None:
+            resolved = file_proj[f]
+            if resolved is None:
                 print(f"[WARN] No git project found for file '{f}' (CR {cr_id})")
                 continue
-            project_map[proj][cr_id].add(f)
+            proj, abs_path, rel_to_repo = resolved
+            project_map[proj][cr_id].append((f, abs_path, rel_to_repo))
+
+    # 最後統一去重 + 排序一次，後面的 grouping / commit body 直接沿用
+    for cr_files in project_map.values():
+        for cr_id, files in cr_files.items():
+            cr_files[cr_id] = sorted(set(files))
 
     return project_map, cr_info
 
@@ -252,6 +287,39 @@ def build_project_groups(parsed, root_dir):
 # 3. 依 project + CR overlap 做 grouping
 # ------------------------------------------------------------
 
+class DSU:
+    """
+    Union-find（disjoint set），用來把有共同檔案的 CR 併成同一組。
+    find 用 path halving，union 依 rank 合併。
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.rank = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.rank[x] = 0
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra = self.find(a)
+        rb = self.find(b)
+        if ra == rb:
+            return
+        if self.rank[ra] < self.rank[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[ra] += 1
+
+
 def find_cr_components_per_project(project_map):
     """
     對每個 project，找出 CR 的 connected components（有共同檔案就互相相連）。
@@ -261,60 +329,45 @@ def find_cr_components_per_project(project_map):
     commit_plans: list of {
         "project": "frameworks/base" 或 "",
         "group_crs": ["ALPS1", "ALPS2", ...],
-        "all_files": [檔案完整路徑列表（相對於 root_dir）],
-        "cr_files": { cr_id: [該 CR 在此 project 中的檔案] },
+        "all_files": [(file, abs_path, rel_to_repo), ...]（依 file 排序）,
+        "cr_files": { cr_id: [該 CR 在此 project 中的 (file, abs_path, rel_to_repo)] },
     }
     """
     commit_plans = []
 
     for proj, cr_files in project_map.items():
-        # cr_files: { cr_id: set(files) }
+        # cr_files: { cr_id: [(file, abs_path, rel_to_repo), ...]（已排序） }
         # file -> [cr_ids]
         file_to_crs = defaultdict(list)
         for cr_id, files in cr_files.items():
             for f in files:
                 file_to_crs[f].append(cr_id)
 
-        # adjacency list
+        # 同一個檔案的所有 CR 併成同一組
+        dsu = DSU()
+        for crs in file_to_crs.values():
+            for c in crs[1:]:
+                dsu.union(crs[0], c)
+
+        # 依 root 分桶，cr_ids 已排序，所以元件順序與元件內順序都穩定
         cr_ids = sorted(cr_files.keys())
-        adj = {cr: set() for cr in cr_ids}
-        for f, crs in file_to_crs.items():
-            if len(crs) > 1:
-                for i in range(len(crs)):
-                    for j in range(i + 1, len(crs)):
-                        a, b = crs[i], crs[j]
-                        adj[a].add(b)
-                        adj[b].add(a)
-
-        # DFS / BFS 找連通元件
-        visited = set()
+        components = defaultdict(list)
         for cr in cr_ids:
-            if cr in visited:
-                continue
-            component = []
-            dq = deque([cr])
-            visited.add(cr)
-            while dq:
-                node = dq.popleft()
-                component.append(node)
-                for nb in adj[node]:
-                    if nb not in visited:
-                        visited.add(nb)
-                        dq.append(nb)
-            component_sorted = sorted(component)
+            components[dsu.find(cr)].append(cr)
 
+        for component in components.values():
             # 收集此 group 的所有檔案（此 project 中）
-            all_files = set()
-            cr_files_subset = {}
-            for c in component_sorted:
-                files = sorted(cr_files[c])
-                cr_files_subset[c] = files
-                all_files.update(files)
+            # 各 CR 的 list 已排好序，只有多個 CR 合併時才需要再排一次
+            cr_files_subset = {c: cr_files[c] for c in component}
+            if len(component) == 1:
+                all_files = cr_files[component[0]]
+            else:
+                all_files = sorted(set().union(*cr_files_subset.values()))
 
             commit_plans.append({
                 "project": proj,  # 可能是 "" (root repo)
-                "group_crs": component_sorted,
-                "all_files": sorted(all_files),
+                "group_crs": component,
+                "all_files": all_files,
                 "cr_files": cr_files_subset,
             })
 
@@ -330,15 +383,13 @@ def assign_repo_index(commit_plans):
     依照 group_crs (CR ID 的組合) 分組。
     同一組 CR 在不同 project 出現 -> 給 [i/n]。
     """
-    groups = defaultdict(list)  # key: tuple(group_crs) -> list of indices
-
-    for idx, plan in enumerate(commit_plans):
-        key = tuple(plan["group_crs"])
-        groups[key].append(idx)
+    # 只對 index 依 (CR 組合, project) 排序一次：同一組 CR 會連在一起，
+    # 組內按 project 名稱排序讓順序穩定；commit_plans 本身的順序不變
+    keys = [(tuple(plan["group_crs"]), plan["project"]) for plan in commit_plans]
+    order = sorted(range(len(commit_plans)), key=keys.__getitem__)
 
-    for key, idxs in groups.items():
-        # 按 project 名稱排序，讓順序穩定
-        idxs.sort(key=lambda i: commit_plans[i]["project"])
+    for _, run in groupby(order, key=lambda i: keys[i][0]):
+        idxs = list(run)
         total = len(idxs)
         for pos, i in enumerate(idxs, start=1):
             commit_plans[i]["repo_index"] = pos
@@ -359,7 +410,7 @@ def transform_description_for_title(desc_first):
     """
     if not desc_first:
         return ""
-    m = re.match(r"\[Google Security Patch\]\s*\[[^\]]+\](.*)", desc_first)
+    m = _GSP_RE.match(desc_first)
     if m:
         return "[Google Security Patch] " + m.group(1).strip()
     return desc_first
@@ -374,8 +425,10 @@ def build_commit_title(p_tag, group_crs, cr_info, repo_index=None, repo_total=No
     if not group_crs:
         return f"[{p_tag}]"
 
-    first_cr = sorted(group_crs)[0]
-    desc_first = cr_info.get(first_cr, {}).get("description_first", "")
+    # 單一 CR 最常見，不用比較；多個 CR 用 min 即可，不需要 sorted 出整個 list
+    first_cr = group_crs[0] if len(group_crs) == 1 else min(group_crs)
+    info = cr_info.get(first_cr)
+    desc_first = info.get("description_first", "") if info else ""
     subject_core = transform_description_for_title(desc_first)
 
     parts = [f"[{p_tag}]"]
@@ -408,60 +461,48 @@ def build_commit_body(group_crs, cr_info, plan):
     Associated Files (this project):
       ... (此 project 下屬於該 CR 的檔案)
     """
-    lines = []
+    blocks = []
     for cr in group_crs:
         info = cr_info.get(cr, {})
         patch_type = info.get("patch_type", "")
         severity = info.get("severity", "")
-        desc_first = info.get("description_first", "")
-        desc_full = info.get("description_full", "")
-
-        lines.append("Patch Type:")
-        lines.append(f"  {patch_type}")
-        lines.append("CR ID:")
-        lines.append(f"  {cr}")
-        lines.append("Severity:")
-        lines.append(f"  {severity}")
-        lines.append("")
-        lines.append("Description:")
-        if desc_full:
-            for l in desc_full.splitlines():
-                lines.append("  " + l.lstrip())
-        elif desc_first:
-            lines.append(f"  {desc_first}")
-        else:
-            lines.append("  (no description)")
-        lines.append("")
+        desc = info.get("description_indented", "  (no description)")
+
+        block = (
+            f"Patch Type:\n  {patch_type}\n"
+            f"CR ID:\n  {cr}\n"
+            f"Severity:\n  {severity}\n"
+            f"\n"
+            f"Description:\n{desc}\n"
+        )
 
         proj_files = plan["cr_files"].get(cr, [])
         if proj_files:
-            lines.append("Associated Files (this project):")
-            proj_root = plan["project"]
-            for f in sorted(proj_files):
-                if proj_root:
-                    rel = os.path.relpath(f, proj_root)
-                else:
-                    rel = f
-                lines.append(f"  {rel}")
-        lines.append("")
+            files = "\n".join("  " + rel_to_repo for _, _, rel_to_repo in proj_files)
+            block += f"\nAssociated Files (this project):\n{files}"
+        blocks.append(block)
 
-    body = "\n".join(lines).rstrip() + "\n"
-    return body
+    # 每個區塊之間空一行
+    return "\n\n".join(blocks).rstrip() + "\n"
 
 
 # ------------------------------------------------------------
 # 6. 執行 git add / commit（或 dry-run 印計畫）
 # ------------------------------------------------------------
 
-def run_git_cmd(args, cwd, check=True, capture_output=False):
+def run_git_cmd(args, cwd, check=True, capture_output=False, input=None):
     """
     小幫手：執行 git 指令。
+    input 有給的話會寫進 stdin（例如 git commit -F -）。
     """
     result = subprocess.run(
         args,
         cwd=cwd,
         check=False,
-        text=True,
+        # commit 訊息與 git 輸出都用 UTF-8，不依賴系統 locale
+        encoding="utf-8",
+        errors="replace",
+        input=input,
         stdout=subprocess.PIPE if capture_output else None,
         stderr=subprocess.PIPE if capture_output else None,
     )
@@ -473,6 +514,106 @@ def run_git_cmd(args, cwd, check=True, capture_output=False):
     return result
 
 
+def _commit_one_plan(root_dir, p_tag, idx, plan, cr_info):
+    """
+    對單一 commit plan 執行 git add + git commit。
+    輸出先收起來再整段回傳，多個 project 平行執行時才不會互相交錯。
+    """
+    out = []
+    proj = plan["project"]  # 可能是 "" (root)
+    group_crs = plan["group_crs"]
+    repo_index = plan.get("repo_index")
+    repo_total = plan.get("repo_total")
+
+    # project 只會在找到 .git 的目錄上成立，所以 repo_dir 一定存在
+    repo_dir = os.path.join(root_dir, proj) if proj else root_dir
+
+    title = build_commit_title(p_tag, group_crs, cr_info, repo_index, repo_total)
+    body = build_commit_body(group_crs, cr_info, plan)
+    message = title + "\n\n" + body
+
+    out.append(f"[{idx}] Project: {proj or '(root)'}")
+    out.append(f"    Commit title: {title}")
+
+    # git add：一次 add 此 commit 的所有檔案（只讀寫一次 index）
+    rel_paths = []
+    for f, abs_path, rel_to_repo in plan["all_files"]:
+        if not os.path.exists(abs_path):
+            out.append(f"    [WARN] File not found, skip add: {f}")
+            continue
+        rel_paths.append(rel_to_repo)
+
+    # --verbose 會替每個寫進 index 的檔案印一行 add '...' / remove '...'，
+    # 通常有輸出就代表有 staged changes，可以省掉 git diff --cached；
+    # 但檔案被改回和 HEAD 一樣時也會印，這種情況留給 commit 失敗時再確認
+    staged = False
+    if rel_paths:
+        res = run_git_cmd(
+            ["git", "add", "--verbose", "--"] + rel_paths,
+            cwd=repo_dir,
+            check=False,
+            capture_output=True,
+        )
+        if res.returncode == 0:
+            add_results = [res]
+        else:
+            # 批次 add 失敗時（例如其中一個檔案被 .gitignore 忽略），
+            # git 可能已經 stage 了其他檔案；改回逐檔 add，只跳過失敗的那個檔案
+            add_results = []
+            for rel_to_repo in rel_paths:
+                try:
+                    add_results.append(run_git_cmd(
+                        ["git", "add", "--verbose", "--", rel_to_repo],
+                        cwd=repo_dir,
+                        check=True,
+                        capture_output=True,
+                    ))
+                except RuntimeError as e:
+                    out.append(f"    [ERROR] git add failed for {rel_to_repo}: {e}")
+        for r in add_results:
+            # 保留 git 的警告（例如 CRLF / LF 轉換）
+            if r.stderr.strip():
+                out.append(r.stderr.rstrip("\n"))
+        staged = any(r.stdout.strip() for r in add_results)
+
+    # add 沒更新任何檔案時，才檢查 index 裡是否原本就有 staged changes
+    if not staged:
+        diff_cached = subprocess.run(
+            ["git", "diff", "--cached", "--quiet"],
+            cwd=repo_dir,
+        )
+        if diff_cached.returncode == 0:
+            out.append("    [INFO] No staged changes, skip commit.")
+            return "\n".join(out)
+
+    # commit 訊息直接從 stdin 餵給 git，不用暫存檔
+    try:
+        res = run_git_cmd(
+            ["git", "commit", "-F", "-"],
+            cwd=repo_dir,
+            check=True,
+            capture_output=True,
+            input=message,
+        )
+        for stream in (res.stdout, res.stderr):
+            if stream.strip():
+                out.append(stream.rstrip("\n"))
+        out.append("    [OK] Commit created.")
+    except RuntimeError as e:
+        # add 有輸出但 index 其實和 HEAD 一樣（例如檔案被改回原樣），
+        # 和原本一樣當成沒有 staged changes，不算錯誤
+        diff_cached = subprocess.run(
+            ["git", "diff", "--cached", "--quiet"],
+            cwd=repo_dir,
+        )
+        if diff_cached.returncode == 0:
+            out.append("    [INFO] No staged changes, skip commit.")
+        else:
+            out.append(f"    [ERROR] git commit failed in {repo_dir}: {e}")
+
+    return "\n".join(out)
+
+
 def perform_commits(root_dir, p_tag, commit_plans, cr_info, dry_run=False):
     """
     實際執行（或 dry-run）每個 project + CR group 的 commit。
@@ -493,7 +634,7 @@ def perform_commits(root_dir, p_tag, commit_plans, cr_info, dry_run=False):
             print(f"    Repo index: {repo_index}/{repo_total}")
         print(f"    Title: {title}")
         print("    Files:")
-        for f in plan["all_files"]:
+        for f, _, _ in plan["all_files"]:
             print(f"      - {f}")
 
     if dry_run:
@@ -518,62 +659,63 @@ def perform_commits(root_dir, p_tag, commit_plans, cr_info, dry_run=False):
 
     print("\n開始執行 git add / git commit ...\n")
 
+    # 不同 project 的 index 互相獨立，可以平行 commit 來重疊 git 的啟動與 I/O；
+    # 同一個 project 的多個 plan 共用同一個 index，必須在同一個 thread 依序執行
+    by_project = defaultdict(list)
     for idx, plan in enumerate(commit_plans, start=1):
-        proj = plan["project"]  # 可能是 "" (root)
-        group_crs = plan["group_crs"]
-        repo_index = plan.get("repo_index")
-        repo_total = plan.get("repo_total")
-
-        repo_dir = os.path.join(root_dir, proj) if proj else root_dir
-        if not os.path.isdir(repo_dir):
-            print(f"[WARN] Project dir not found, skip: {repo_dir}")
-            continue
-
-        title = build_commit_title(p_tag, group_crs, cr_info, repo_index, repo_total)
-        body = build_commit_body(group_crs, cr_info, plan)
-        message = title + "\n\n" + body
-
-        print(f"[{idx}] Project: {proj or '(root)'}")
-        print(f"    Commit title: {title}")
-
-        # git add
-        for f in plan["all_files"]:
-            abs_path = os.path.join(root_dir, f)
-            if not os.path.exists(abs_path):
-                print(f"    [WARN] File not found, skip add: {f}")
-                continue
-            rel_to_repo = os.path.relpath(abs_path, repo_dir)
+        by_project[plan["project"]].append((idx, plan))
+
+    # 每個 plan 做完就把結果放進 results，主 thread 依 plan 順序等待並輸出，
+    # 不用等同一個 project 後面的 plan
+    results = {}  # idx -> (True, output) 或 (False, exception)
+    results_cond = threading.Condition()
+    stop = threading.Event()
+
+    def commit_project(items):
+        for pos, (idx, plan) in enumerate(items):
+            # 主 thread 已經中止（出錯或 Ctrl-C）就不再開始新的 plan
+            if stop.is_set():
+                return
             try:
-                run_git_cmd(["git", "add", rel_to_repo], cwd=repo_dir, check=True)
-            except RuntimeError as e:
-                print(f"    [ERROR] git add failed for {rel_to_repo}: {e}")
-                continue
-
-        # 檢查是否真的有 staged changes
-        diff_cached = subprocess.run(
-            ["git", "diff", "--cached", "--quiet"],
-            cwd=repo_dir,
-        )
-        if diff_cached.returncode == 0:
-            print("    [INFO] No staged changes, skip commit.")
-            continue
-
-        # 寫入暫存訊息檔再 commit
-        with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8") as tmp:
-            tmp.write(message)
-            tmp_path = tmp.name
-
+                result = (True, _commit_one_plan(root_dir, p_tag, idx, plan, cr_info))
+            except Exception as e:
+                # 這個 project 後面的 plan 不再執行，和依序執行時一樣中止
+                with results_cond:
+                    for later_idx, _ in items[pos:]:
+                        results[later_idx] = (False, e)
+                    results_cond.notify_all()
+                return
+            with results_cond:
+                results[idx] = result
+                results_cond.notify_all()
+
+    max_workers = max(1, min(len(by_project), (os.cpu_count() or 1) * 2))
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for items in by_project.values():
+            ex.submit(commit_project, items)
+
+        # 仍依原本 plan 的順序輸出
+        printed = 0
         try:
-            run_git_cmd(["git", "commit", "-F", tmp_path], cwd=repo_dir, check=True)
-            print("    [OK] Commit created.")
-        except RuntimeError as e:
-            print(f"    [ERROR] git commit failed in {repo_dir}: {e}")
-        finally:
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                pass
-
+            for idx in range(1, len(commit_plans) + 1):
+                with results_cond:
+                    while idx not in results:
+                        results_cond.wait()
+                    ok, value = results[idx]
+                if not ok:
+                    raise value
+                print(value)
+                printed = idx
+        except BaseException:
+            # 還沒開始的 plan 都不做了；正在跑的 plan 會等它做完，
+            # 再把已經做完但還沒印出的結果印出來，才知道哪些 commit 已經建立
+            stop.set()
+            ex.shutdown(cancel_futures=True)
+            for idx in sorted(results):
+                ok, value = results[idx]
+                if idx > printed and ok:
+                    print(value)
+            raise
 
 # ------------------------------------------------------------
 # 7. main